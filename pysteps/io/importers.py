@@ -14,7 +14,10 @@ is the name of the input file.
 The output of each method is a three-element tuple containing a two-dimensional
 precipitation field, the corresponding quality field and a metadata dictionary.
 If the file contains no quality information, the quality field is set to None.
-Pixels containing missing data are set to nan.
+Pixels containing missing data are set to nan. The importers of 8-bit
+composites can optionally return a boolean mask of the valid pixels in
+metadata["valid_mask"] instead, leaving the values of the missing pixels
+undefined.
 
 The metadata dictionary contains the following mandatory key-value pairs:
 
@@ -80,44 +83,62 @@ Available Importers
 """
 
 
+import functools
 import gzip
-from matplotlib.pyplot import imread
+import importlib.util
+import io
 import numpy as np
 import os
+import threading
 
 from pysteps.exceptions import DataModelError
 from pysteps.exceptions import MissingOptionalDependency
 
-try:
-    import h5py
-
-    h5py_imported = True
-except ImportError:
-    h5py_imported = False
-try:
-    import metranet
-
-    metranet_imported = True
-except ImportError:
-    metranet_imported = False
-try:
-    import netCDF4
-
-    netcdf4_imported = True
-except ImportError:
-    netcdf4_imported = False
-try:
-    import PIL
-
-    pil_imported = True
-except ImportError:
-    pil_imported = False
-try:
-    import pyproj
-
-    pyproj_imported = True
-except ImportError:
-    pyproj_imported = False
+# The optional dependencies are only looked up here and imported by the
+# functions that need them, so that importing this module stays cheap.
+h5py_imported = importlib.util.find_spec("h5py") is not None
+metranet_imported = importlib.util.find_spec("metranet") is not None
+netcdf4_imported = importlib.util.find_spec("netCDF4") is not None
+pil_imported = importlib.util.find_spec("PIL") is not None
+pyproj_imported = importlib.util.find_spec("pyproj") is not None
+numba_imported = importlib.util.find_spec("numba") is not None
+
+# minimum number of pixels for which the numba lookup table kernel is used
+# instead of numpy, so that its call overhead is amortized
+_numba_min_size = 100000
+
+# the netCDF4 library is not thread-safe
+_netcdf4_lock = threading.Lock()
+
+# lookup table for the MeteoSwiss AQC/CPC 8-bit products [mm/5min], in single
+# precision since the values are derived from 8 bits of input
+_mch_aqc_lut = np.zeros(256, dtype=np.float32)
+_mch_aqc_lut[2:251] = (
+    10.0 ** ((np.arange(2, 251) - 71.5) / 20.0) / 316.0
+) ** (1.0 / 1.5)
+_mch_aqc_lut[255] = np.nan
+
+# FMI stereographic projection. The ellipsoid and false easting/northing are
+# hard-coded because the projection definition is missing from the PGM files.
+_fmi_pgm_projdef = (
+    "+proj=stere  +lon_0={lon_0}E +lat_0={lat_0}N +lat_ts={lat_ts}"
+    " +a=6371288 +x_0=380886.310 +y_0=3395677.920 +no_defs"
+)
+
+# Swiss radar domain CCS4 in the LV03 projection, see _import_mch_geodata
+_mch_geodata = {
+    "projection": "+proj=somerc  +lon_0=7.43958333333333"
+    " +lat_0=46.9524055555556 +k_0=1 +x_0=600000 +y_0=200000"
+    " +ellps=bessel +towgs84=674.374,15.056,405.346,0,0,0,0"
+    " +units=m +no_defs",
+    "x1": 255000.0,
+    "y1": -160000.0,
+    "x2": 965000.0,
+    "y2": 480000.0,
+    "xpixelsize": 1000.0,
+    "ypixelsize": 1000.0,
+    "yorigin": "upper",
+}
 
 
 def import_bom_rf3(filename, **kwargs):
@@ -141,10 +162,13 @@ def import_bom_rf3(filename, **kwargs):
             "netCDF4 package is required to import BoM Rainfields3 products "
             "but it is not installed"
         )
+    import netCDF4
 
-    R = _import_bom_rf3_data(filename)
+    with _netcdf4_lock:
+        with netCDF4.Dataset(filename) as ds_rainfall:
+            R = _read_bom_rf3_data(ds_rainfall)
+            geodata = _read_bom_rf3_geodata(ds_rainfall)
 
-    geodata = _import_bom_rf3_geodata(filename)
     metadata = geodata
     # TODO(import_bom_rf3): Add missing georeferencing data.
 
@@ -158,23 +182,70 @@ def import_bom_rf3(filename, **kwargs):
     return R, None, metadata
 
 
-def _import_bom_rf3_data(filename):
-    ds_rainfall = netCDF4.Dataset(filename)
+def _import_bom_rf3_geodata(filename):
+    import netCDF4
+
+    with _netcdf4_lock:
+        with netCDF4.Dataset(filename) as ds_rainfall:
+            geodata = _read_bom_rf3_geodata(ds_rainfall)
+
+    return geodata
+
+
+def _read_bom_rf3_data(ds_rainfall):
     if "precipitation" in ds_rainfall.variables.keys():
-        precipitation = ds_rainfall.variables["precipitation"][:]
+        import netCDF4
+
+        var = ds_rainfall.variables["precipitation"]
+        # decode the raw values ourselves instead of letting netCDF4 create
+        # masked float64 copies of them
+        var.set_auto_maskandscale(False)
+        attrs = var.ncattrs()
+        if "_FillValue" in attrs:
+            fillvalue = var._FillValue
+        else:
+            fillvalue = netCDF4.default_fillvals[var.dtype.str[1:]]
+        missingvalue = var.missing_value if "missing_value" in attrs else None
+        if "valid_range" in attrs:
+            validmin, validmax = var.valid_range
+        else:
+            validmin = var.valid_min if "valid_min" in attrs else None
+            validmax = var.valid_max if "valid_max" in attrs else None
+
+        precipitation = np.empty(var.shape, dtype=np.float32)
+        # read the variable in slabs aligned with its chunks so that only one
+        # decompressed chunk row is held in memory at a time
+        chunking = var.chunking()
+        if chunking in (None, "contiguous"):
+            step = var.shape[0]
+        else:
+            step = chunking[0]
+        for i in range(0, var.shape[0], step):
+            raw = var[i : i + step]
+            slab = precipitation[i : i + step]
+            slab[...] = raw
+            if "scale_factor" in attrs:
+                slab *= np.float32(var.scale_factor)
+            if "add_offset" in attrs:
+                slab += np.float32(var.add_offset)
+            slab[raw == fillvalue] = np.nan
+            if missingvalue is not None:
+                slab[np.isin(raw, missingvalue)] = np.nan
+            if validmin is not None:
+                slab[raw < validmin] = np.nan
+            if validmax is not None:
+                slab[raw > validmax] = np.nan
     else:
         precipitation = None
-    ds_rainfall.close()
 
     return precipitation
 
 
-def _import_bom_rf3_geodata(filename):
+def _read_bom_rf3_geodata(ds_rainfall):
+    import netCDF4
 
     geodata = {}
 
-    ds_rainfall = netCDF4.Dataset(filename)
-
     if "proj" in ds_rainfall.variables.keys():
         projection = ds_rainfall.variables["proj"]
         if getattr(projection, "grid_mapping_name") == "albers_conical_equal_area":
@@ -218,7 +289,7 @@ def _import_bom_rf3_geodata(filename):
     geodata["y2"] = ymax * factor_scale
     geodata["xpixelsize"] = xpixelsize * factor_scale
     geodata["ypixelsize"] = ypixelsize * factor_scale
-    geodata["yorigin"] = "upper"  # TODO(_import_bom_rf3_geodata): check this
+    geodata["yorigin"] = "upper"  # TODO(_read_bom_rf3_geodata): check this
 
     # get the accumulation period
     valid_time = None
@@ -259,7 +330,6 @@ def _import_bom_rf3_geodata(filename):
             geodata["unit"] = "mm"
 
     geodata["institution"] = "Commonwealth of Australia, Bureau of Meteorology"
-    ds_rainfall.close()
 
     return geodata
 
@@ -276,6 +346,10 @@ def import_fmi_pgm(filename, **kwargs):
     ----------------
     gzipped : bool
         If True, the input file is treated as a compressed gzip file.
+    valid_mask : bool
+        If True, the missing values are not set to nan. Instead, a boolean
+        array marking the valid pixels is stored in metadata["valid_mask"]
+        and the values of the other pixels are undefined. Defaults to False.
 
     Returns
     -------
@@ -293,30 +367,47 @@ def import_fmi_pgm(filename, **kwargs):
         )
 
     gzipped = kwargs.get("gzipped", False)
+    valid_mask = kwargs.get("valid_mask", False)
+
+    with _open_fmi_pgm(filename, gzipped=gzipped) as f:
+        pgm_metadata, shape = _read_fmi_pgm_header(f)
+        # the maximum gray value of the PGM header is used as the missing value
+        if pgm_metadata["missingval"] > 255:
+            raise ValueError(
+                "only 8-bit PGM files are supported, but the maximum value is %d"
+                % pgm_metadata["missingval"]
+            )
+        R = np.frombuffer(f.read(), dtype=np.uint8, count=shape[0] * shape[1])
+        R = R.reshape(shape)
 
-    pgm_metadata = _import_fmi_pgm_metadata(filename, gzipped=gzipped)
-
-    if gzipped is False:
-        R = imread(filename)
-    else:
-        R = imread(gzip.open(filename, "r"))
     geodata = _import_fmi_pgm_geodata(pgm_metadata)
 
-    MASK = R == pgm_metadata["missingval"]
-    R = R.astype(float)
-    R[MASK] = np.nan
-    R = (R - 64.0) / 2.0
-
     metadata = geodata
+
+    # convert the 8-bit values to dBZ and set the missing values to nan in a
+    # single lookup table pass
+    lut = (np.arange(256, dtype=np.float32) - 64.0) * 0.5
+    if valid_mask:
+        MASK = R != pgm_metadata["missingval"]
+        metadata["valid_mask"] = MASK
+    else:
+        lut[pgm_metadata["missingval"]] = np.nan
+    R = _apply_lut(R, lut)
+    R_valid = R[MASK] if valid_mask else R
+
     metadata["institution"] = "Finnish Meteorological Institute"
     metadata["accutime"] = 5.0
     metadata["unit"] = "dBZ"
     metadata["transform"] = "dB"
-    metadata["zerovalue"] = np.nanmin(R)
-    if np.any(np.isfinite(R)):
-        metadata["threshold"] = np.nanmin(R[R > np.nanmin(R)])
-    else:
+    if R_valid.size == 0:
+        metadata["zerovalue"] = np.nan
         metadata["threshold"] = np.nan
+    else:
+        metadata["zerovalue"] = np.nanmin(R_valid)
+        if np.any(np.isfinite(R_valid)):
+            metadata["threshold"] = np.nanmin(R_valid[R_valid > np.nanmin(R_valid)])
+        else:
+            metadata["threshold"] = np.nan
 
     return R, None, metadata
 
@@ -324,34 +415,26 @@ def import_fmi_pgm(filename, **kwargs):
 def _import_fmi_pgm_geodata(metadata):
     geodata = {}
 
-    projdef = ""
-
     if metadata["type"][0] != "stereographic":
         raise ValueError("unknown projection %s" % metadata["type"][0])
-    projdef += "+proj=stere "
-    projdef += " +lon_0=" + metadata["centrallongitude"][0] + "E"
-    projdef += " +lat_0=" + metadata["centrallatitude"][0] + "N"
-    projdef += " +lat_ts=" + metadata["truelatitude"][0]
-    # These are hard-coded because the projection definition is missing from the
-    # PGM files.
-    projdef += " +a=6371288"
-    projdef += " +x_0=380886.310"
-    projdef += " +y_0=3395677.920"
-    projdef += " +no_defs"
-    #
+    projdef = _fmi_pgm_projdef.format(
+        lon_0=metadata["centrallongitude"][0],
+        lat_0=metadata["centrallatitude"][0],
+        lat_ts=metadata["truelatitude"][0],
+    )
     geodata["projection"] = projdef
 
-    ll_lon, ll_lat = [float(v) for v in metadata["bottomleft"]]
-    ur_lon, ur_lat = [float(v) for v in metadata["topright"]]
+    ll_lon, ll_lat = map(float, metadata["bottomleft"])
+    ur_lon, ur_lat = map(float, metadata["topright"])
 
-    pr = pyproj.Proj(projdef)
-    x1, y1 = pr(ll_lon, ll_lat)
-    x2, y2 = pr(ur_lon, ur_lat)
+    # project both corners with a single call
+    pr = _get_proj(projdef)
+    x, y = pr(np.array([ll_lon, ur_lon]), np.array([ll_lat, ur_lat]))
 
-    geodata["x1"] = x1
-    geodata["y1"] = y1
-    geodata["x2"] = x2
-    geodata["y2"] = y2
+    geodata["x1"] = float(x[0])
+    geodata["y1"] = float(y[0])
+    geodata["x2"] = float(x[1])
+    geodata["y2"] = float(y[1])
 
     geodata["xpixelsize"] = float(metadata["metersperpixel_x"][0])
     geodata["ypixelsize"] = float(metadata["metersperpixel_y"][0])
@@ -362,35 +445,65 @@ def _import_fmi_pgm_geodata(metadata):
 
 
 def _import_fmi_pgm_metadata(filename, gzipped=False):
-    metadata = {}
+    with _open_fmi_pgm(filename, gzipped=gzipped) as f:
+        metadata, _ = _read_fmi_pgm_header(f)
+
+    return metadata
 
+
+def _open_fmi_pgm(filename, gzipped=False):
     if not gzipped:
-        f = open(filename, "rb")
+        return open(filename, "rb")
     else:
-        f = gzip.open(filename, "rb")
-
-    l = f.readline()
-    while not l.startswith(b"#"):
-        l = f.readline()
-    while l.startswith(b"#"):
-        x = l.decode()
-        x = x[1:].strip().split(" ")
+        # a large read buffer lets zlib inflate the file in a few big chunks
+        # instead of the default 8 KiB ones
+        return io.BufferedReader(gzip.open(filename, "rb"), buffer_size=1 << 20)
+
+
+def _read_fmi_pgm_header(f):
+    """Read the header of a PGM file opened in binary mode. On return, f is
+    positioned at the first byte of the pixel data. Returns the metadata
+    dictionary and the (height, width) shape of the raster."""
+    start = f.tell()
+
+    # read the header in bulk and parse it from memory, fetching more bytes
+    # only if the header does not fit in the first block
+    header = f.read(4096)
+    while True:
+        # the last element may be an incomplete line
+        lines = header.split(b"\n")[:-1]
+        try:
+            metadata, shape, num_lines = _parse_fmi_pgm_header(lines)
+            break
+        except IndexError:
+            block = f.read(4096)
+            if not block:
+                raise IOError("incomplete PGM header")
+            header += block
+
+    f.seek(start + sum(len(l) + 1 for l in lines[:num_lines]))
+
+    return metadata, shape
+
+
+def _parse_fmi_pgm_header(lines):
+    metadata = {}
+
+    i = 0
+    while not lines[i].startswith(b"#"):
+        i += 1
+    while lines[i].startswith(b"#"):
+        x = lines[i][1:].decode().strip().split(" ")
         if len(x) >= 2:
-            k = x[0]
-            v = x[1:]
-            metadata[k] = v
-        else:
-            l = f.readline()
-            continue
-        l = f.readline()
-    l = f.readline().decode()
-    metadata["missingval"] = int(l)
-    f.close()
+            metadata[x[0]] = x[1:]
+        i += 1
+    width, height = [int(v) for v in lines[i].split()]
+    metadata["missingval"] = int(lines[i + 1])
 
-    return metadata
+    return metadata, (height, width), i + 2
 
 
-def import_mch_gif(filename, product, unit, accutime):
+def import_mch_gif(filename, product, unit, accutime, **kwargs):
     """Import a 8-bit gif radar reflectivity composite from the MeteoSwiss
     archive.
 
@@ -421,6 +534,13 @@ def import_mch_gif(filename, product, unit, accutime):
     accutime : float
         the accumulation time in minutes of the data
 
+    Other Parameters
+    ----------------
+    valid_mask : bool
+        If True, the missing values are not set to nan. Instead, a boolean
+        array marking the valid pixels is stored in metadata["valid_mask"]
+        and the values of the other pixels are undefined. Defaults to False.
+
     Returns
     -------
     out : tuple
@@ -435,6 +555,9 @@ def import_mch_gif(filename, product, unit, accutime):
             "radar reflectivity composite from MeteoSwiss"
             "but it is not installed"
         )
+    import PIL.Image
+
+    valid_mask = kwargs.get("valid_mask", False)
 
     geodata = _import_mch_geodata()
 
@@ -445,8 +568,10 @@ def import_mch_gif(filename, product, unit, accutime):
 
     if product.lower() in ["azc", "rzc", "precip"]:
 
-        # convert 8-bit GIF colortable to RGB values
-        Brgb = B.convert("RGB")
+        # convert 8-bit GIF colortable to RGB values, packed into one integer
+        # per pixel
+        Brgb = np.asarray(B.convert("RGB"), dtype=np.uint32)
+        Brgb = (Brgb[:, :, 0] << 16) | (Brgb[:, :, 1] << 8) | Brgb[:, :, 2]
 
         # load lookup table
         if product.lower() == "azc":
@@ -460,51 +585,56 @@ def import_mch_gif(filename, product, unit, accutime):
         lut = np.genfromtxt(lut_filename, skip_header=1)
         lut = dict(zip(zip(lut[:, 1], lut[:, 2], lut[:, 3]), lut[:, -1]))
 
-        # apply lookup table conversion
-        R = np.zeros(len(Brgb.getdata()))
-        for i, dn in enumerate(Brgb.getdata()):
-            R[i] = lut.get(dn, np.nan)
-
-        # convert to original shape
-        width, height = B.size
-        R = R.reshape(height, width)
+        # apply lookup table conversion to the distinct colors only
+        colors, idx = np.unique(Brgb, return_inverse=True)
+        values = np.array(
+            [lut.get((c >> 16, (c >> 8) & 255, c & 255), np.nan) for c in colors]
+        )
+        R = values[idx].reshape(Brgb.shape)
 
         # set values outside observational range to NaN,
         # and values in non-precipitating areas to zero.
         R[R < 0] = 0
         R[R > 9999] = np.nan
 
+        if valid_mask:
+            MASK = np.isfinite(R)
+            R[~MASK] = 0.0
+
     elif product.lower() in ["aqc", "cpc", "acquire ", "combiprecip"]:
 
         # convert digital numbers to physical values
-        B = np.array(B, dtype=int)
-
-        # build lookup table [mm/5min]
-        lut = np.zeros(256)
-        A = 316.0
-        b = 1.5
-        for i in range(256):
-            if (i < 2) or (i > 250 and i < 255):
-                lut[i] = 0.0
-            elif i == 255:
-                lut[i] = np.nan
-            else:
-                lut[i] = (10.0 ** ((i - 71.5) / 20.0) / A) ** (1.0 / b)
+        B = np.asarray(B, dtype=np.uint8)
 
         # apply lookup table
-        R = lut[B]
+        lut = _mch_aqc_lut
+        if valid_mask:
+            MASK = B != 255
+            lut = lut.copy()
+            lut[255] = 0.0
+        R = _apply_lut(B, lut)
 
     else:
         raise ValueError("unknown product %s" % product)
 
+    if valid_mask:
+        metadata["valid_mask"] = MASK
+        R_valid = R[MASK]
+    else:
+        R_valid = R
+
     metadata["accutime"] = accutime
     metadata["unit"] = unit
     metadata["transform"] = None
-    metadata["zerovalue"] = np.nanmin(R)
-    if np.any(R > np.nanmin(R)):
-        metadata["threshold"] = np.nanmin(R[R > np.nanmin(R)])
-    else:
+    if R_valid.size == 0:
+        metadata["zerovalue"] = np.nan
         metadata["threshold"] = np.nan
+    else:
+        metadata["zerovalue"] = np.nanmin(R_valid)
+        if np.any(R_valid > np.nanmin(R_valid)):
+            metadata["threshold"] = np.nanmin(R_valid[R_valid > np.nanmin(R_valid)])
+        else:
+            metadata["threshold"] = np.nan
     metadata["institution"] = "MeteoSwiss"
     metadata["product"] = product
 
@@ -543,6 +673,7 @@ def import_mch_hdf5(filename, **kwargs):
             "radar reflectivity composites using ODIM HDF5 specification "
             "but it is not installed"
         )
+    import h5py
 
     qty = kwargs.get("qty", "RATE")
 
@@ -687,6 +818,7 @@ def import_mch_metranet(filename, product, unit, accutime):
             "metranet package needed for importing MeteoSwiss "
             "radar composites but it is not installed"
         )
+    import metranet
 
     ret = metranet.read_file(filename, physic_value=True, verbose=False)
     R = ret.data
@@ -713,33 +845,7 @@ def _import_mch_geodata():
     These are all hard-coded because the georeferencing is missing from the gif files.
     """
 
-    geodata = {}
-
-    # LV03 Swiss projection definition in Proj4
-    projdef = ""
-    projdef += "+proj=somerc "
-    projdef += " +lon_0=7.43958333333333"
-    projdef += " +lat_0=46.9524055555556"
-    projdef += " +k_0=1"
-    projdef += " +x_0=600000"
-    projdef += " +y_0=200000"
-    projdef += " +ellps=bessel"
-    projdef += " +towgs84=674.374,15.056,405.346,0,0,0,0"
-    projdef += " +units=m"
-    projdef += " +no_defs"
-    geodata["projection"] = projdef
-
-    geodata["x1"] = 255000.0
-    geodata["y1"] = -160000.0
-    geodata["x2"] = 965000.0
-    geodata["y2"] = 480000.0
-
-    geodata["xpixelsize"] = 1000.0
-    geodata["ypixelsize"] = 1000.0
-
-    geodata["yorigin"] = "upper"
-
-    return geodata
+    return _mch_geodata.copy()
 
 
 def import_odim_hdf5(filename, **kwargs):
@@ -774,6 +880,7 @@ def import_odim_hdf5(filename, **kwargs):
             "radar reflectivity composites using ODIM HDF5 specification "
             "but it is not installed"
         )
+    import h5py
 
     qty = kwargs.get("qty", "RATE")
 
@@ -832,7 +939,7 @@ def import_odim_hdf5(filename, **kwargs):
 
     where = f["where"]
     proj4str = where.attrs["projdef"].decode()
-    pr = pyproj.Proj(proj4str)
+    pr = _get_proj(proj4str)
 
     LL_lat = where.attrs["LL_lat"]
     LL_lon = where.attrs["LL_lon"]
@@ -915,6 +1022,42 @@ def import_odim_hdf5(filename, **kwargs):
     return R, Q, metadata
 
 
+@functools.lru_cache(maxsize=8)
+def _get_proj(projdef):
+    # consecutive files of the same product share the projection, so the
+    # pyproj.Proj object is initialized only once
+    import pyproj
+
+    return pyproj.Proj(projdef)
+
+
+def _apply_lut(B, lut):
+    """Map the 8-bit array B through the 256-element lookup table lut."""
+    R = np.empty(B.shape, dtype=lut.dtype)
+    if numba_imported and B.size >= _numba_min_size:
+        _get_numba_lut_kernel()(B.ravel(), lut, R.ravel())
+    else:
+        np.take(lut, B, out=R, mode="clip")
+
+    return R
+
+
+@functools.lru_cache(maxsize=1)
+def _get_numba_lut_kernel():
+    # the kernel is compiled on first use and the result is cached on disk.
+    # It is deliberately serial: the gather is memory-bound, and numba's
+    # parallel threading layers do not support calls from several Python
+    # threads, e.g. from io.readers.read_files.
+    import numba
+
+    @numba.njit(cache=True)
+    def apply_lut(B, lut, R):
+        for i in range(B.shape[0]):
+            R[i] = lut[B[i]]
+
+    return apply_lut
+
+
 def _read_mch_hdf5_what_group(whatgrp):
 
     qty = whatgrp.attrs["quantity"] if "quantity" in whatgrp.attrs.keys() else "RATE"
@@ -966,6 +1109,7 @@ def import_knmi_hdf5(filename, **kwargs):
 
     if not h5py_imported:
         raise Exception("h5py not imported")
+    import h5py
 
     # Generally, the 5 min. data is used, but also hourly, daily and monthly
     # accumulations are present.
@@ -999,7 +1143,7 @@ def import_knmi_hdf5(filename, **kwargs):
     # KNMI data.
     geographic = f["geographic"]
     proj4str = geographic["map_projection"].attrs["projection_proj4_params"].decode()
-    pr = pyproj.Proj(proj4str)
+    pr = _get_proj(proj4str)
     metadata["projection"] = proj4str
 
     # Get coordinates
@@ -8,8 +8,11 @@ Module with the reader functions.
     :toctree: ../generated/
 
     read_timeseries
+    read_files
 """
 
+from concurrent.futures import ThreadPoolExecutor
+
 import numpy as np
 
 def read_timeseries(inputfns, importer, **kwargs):
@@ -35,6 +38,10 @@ def read_timeseries(inputfns, importer, **kwargs):
         precipitation and quality fields are filled with nan values. If all
         input file names are None or if the length of the file name list is
         zero, a three-element tuple containing None values is returned.
+        If the importer returns a mask of valid pixels in
+        metadata["valid_mask"], the masks of the files are stacked into
+        a boolean array of shape (num_timesteps, height, width), where the
+        missing files are marked as invalid.
 
     """
 
@@ -55,12 +62,15 @@ def read_timeseries(inputfns, importer, **kwargs):
 
     R = []
     Q = []
+    MASK = []
     timestamps = []
     for i,ifn in enumerate(inputfns[0]):
         if ifn is not None:
-            R_, Q_, _ = importer(ifn, **kwargs)
+            R_, Q_, metadata_ = importer(ifn, **kwargs)
             R.append(R_)
             Q.append(Q_)
+            if "valid_mask" in metadata:
+                MASK.append(metadata_["valid_mask"])
             timestamps.append(inputfns[1][i])
         else:
             R.append(Rref*np.nan)
@@ -68,11 +78,74 @@ def read_timeseries(inputfns, importer, **kwargs):
                 Q.append(Qref*np.nan)
             else:
                 Q.append(None)
+            if "valid_mask" in metadata:
+                MASK.append(np.zeros(Rref.shape, dtype=bool))
             timestamps.append(inputfns[1][i])
 
     # Replace this with stack?
     R = np.concatenate([R_[None, :, :] for R_ in R])
     #TODO: Q should be organized as R, but this is not trivial as Q_ can be also None or a scalar
+    if "valid_mask" in metadata:
+        metadata["valid_mask"] = np.stack(MASK)
     metadata["timestamps"] = np.array(timestamps)
 
     return R, Q, metadata
+
+
+def read_files(filenames, importer, num_workers=1, **kwargs):
+    """Read a list of input files using the methods implemented in the
+    :py:mod:`pysteps.io.importers` module and stack them into a 3d array of
+    shape (num_files, height, width). The files are read in parallel threads.
+
+    Parameters
+    ----------
+    filenames : list
+        Names of the input files. All files are assumed to have the same
+        shape.
+    importer : function
+        A function implemented in the :py:mod:`pysteps.io.importers` module.
+    num_workers : int
+        The number of threads to use for reading the files. The importers
+        spend most of their time in file I/O, decompression and NumPy, so
+        reading is overlapped across files. Access to NetCDF files is
+        serialized by the importers, since netCDF4 is not thread-safe.
+        Do not combine these threads with numba kernels compiled with
+        parallel=True, whose threading layers do not support concurrent
+        calls; the optional numba kernel of the importers is serial for
+        this reason.
+    kwargs : dict
+        Optional keyword arguments for the importer.
+
+    Returns
+    -------
+    out : tuple
+        A three-element tuple containing the read data as a float32 array,
+        the list of quality rasters and the metadata of the first file.
+        If the importer returns a mask of valid pixels in
+        metadata["valid_mask"], the masks of all files are stacked into
+        a boolean array of shape (num_files, height, width). If the list of
+        file names is empty, a three-element tuple containing None values is
+        returned.
+
+    """
+    if len(filenames) == 0:
+        return None, None, None
+
+    def worker(filename):
+        return importer(filename, **kwargs)
+
+    with ThreadPoolExecutor(max_workers=num_workers) as executor:
+        results = list(executor.map(worker, filenames))
+
+    R = np.empty((len(results),) + results[0][0].shape, dtype=np.float32)
+    for i, (R_, _, _) in enumerate(results):
+        R[i] = R_
+    Q = [Q_ for _, Q_, _ in results]
+    metadata = results[0][2]
+    if "valid_mask" in metadata:
+        MASK = np.empty(R.shape, dtype=bool)
+        for i, (_, _, metadata_) in enumerate(results):
+            MASK[i] = metadata_["valid_mask"]
+        metadata["valid_mask"] = MASK
+
+    return R, Q, metadata
@@ -207,6 +207,7 @@ def test_utils_interface():
     from pysteps.utils import conversion
     from pysteps.utils import transformation
     from pysteps.utils import dimension
+    from pysteps.utils import spectral
 
     method_getter = pysteps.utils.interface.get_method
 
@@ -228,7 +229,20 @@ def test_utils_interface():
                              ('clip', dimension.clip_domain),
                              ('square', dimension.square_domain),
                              ('upscale', dimension.aggregate_fields_space),
+                             ('rapsd', spectral.rapsd),
+                             ('rm_rdisc',
+                              spectral.remove_rain_norain_discontinuity),
                              ]
 
     invalid_names = ['random', 'invalid']
     _generic_interface_test(method_getter, valid_names_func_pair, invalid_names)
+
+    # test the copy semantics of the "none" method
+    precip = numpy.random.rand(10, 10)
+    metadata = {"unit": "mm/h"}
+    donothing = method_getter(None)
+    precip_, metadata_ = donothing(precip, metadata)
+    assert precip_ is not precip and numpy.all(precip_ == precip)
+    assert metadata_ is not metadata and metadata_ == metadata
+    precip_, metadata_ = donothing(precip, metadata, copy=False)
+    assert precip_ is precip and metadata_ is metadata
@@ -2,6 +2,7 @@
 
 import pytest
 import os
+import numpy as np
 import pysteps
 from pysteps.tests.helpers import smart_assert
 
@@ -75,3 +76,35 @@ def test_io_import_bom_rf3_geodata(variable, expected, tolerance):
                             "2_20180616_100000.prcp-cscn.nc")
     geodata = pysteps.io.importers._import_bom_rf3_geodata(filename)
     smart_assert(geodata[variable], expected, tolerance)
+
+
+@pytest.mark.parametrize("contiguous", [True, False])
+def test_io_read_bom_rf3_data(tmp_path, contiguous):
+    """Test that the precipitation is decoded as by netCDF4."""
+    netCDF4 = pytest.importorskip("netCDF4")
+    filename = str(tmp_path / "test.nc")
+    data = np.random.RandomState(42).rand(40, 30) * 100.0
+    mask = np.zeros(data.shape, dtype=bool)
+    mask[0, :5] = True
+    with netCDF4.Dataset(filename, "w") as ds:
+        ds.createDimension("y", 40)
+        ds.createDimension("x", 30)
+        if contiguous:
+            kwargs = dict(contiguous=True)
+        else:
+            kwargs = dict(zlib=True, chunksizes=(7, 30))
+        var = ds.createVariable("precipitation", "i2", ("y", "x"),
+                                fill_value=-1, **kwargs)
+        var.scale_factor = 0.05
+        var.valid_min = np.int16(100)
+        var[:] = np.ma.masked_array(data, mask=mask)
+
+    with netCDF4.Dataset(filename) as ds:
+        R = pysteps.io.importers._read_bom_rf3_data(ds)
+    with netCDF4.Dataset(filename) as ds:
+        R_ref = np.ma.filled(ds.variables["precipitation"][:], np.nan)
+
+    assert R.dtype == np.float32
+    assert np.array_equal(np.isnan(R), np.isnan(R_ref))
+    assert np.any(np.isnan(R[1:]))
+    assert np.allclose(R, R_ref, rtol=1e-6, equal_nan=True)
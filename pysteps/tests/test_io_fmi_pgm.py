@@ -1,7 +1,11 @@
 # -*- coding: utf-8 -*-
 
+import gc
+import gzip
 import os
+import warnings
 
+import numpy as np
 import pytest
 
 import pysteps
@@ -76,3 +80,105 @@ def test_io_import_fmi_pgm_geodata(variable, expected, tolerance):
     geodata = pysteps.io.importers._import_fmi_pgm_geodata(metadata)
 
     smart_assert(geodata[variable], expected, tolerance)
+
+
+def test_io_import_fmi_pgm_header_short_comments():
+    """Test that comment lines with less than two tokens are skipped."""
+    lines = [b"P5",
+             b"#",
+             b"# obstime 201609281600",
+             b"# CAPPI",
+             b"#",
+             b"# topright 34.903000 69.005000",
+             b"760 1226",
+             b"255"]
+    metadata, shape, num_lines = \
+        pysteps.io.importers._parse_fmi_pgm_header(lines)
+    assert metadata == {"obstime": ["201609281600"],
+                        "topright": ["34.903000", "69.005000"],
+                        "missingval": 255}
+    assert shape == (1226, 760)
+    assert num_lines == len(lines)
+
+
+def _write_fmi_pgm(filename, data, maxval=255, gzipped=False):
+    """Write a small PGM file with a FMI-like header."""
+    header = ("P5\n"
+              "# type stereographic\n"
+              "# centrallongitude 25\n"
+              "# centrallatitude 90\n"
+              "# truelatitude 60\n"
+              "# bottomleft 18.600000 57.930000\n"
+              "# topright 34.903000 69.005000\n"
+              "# metersperpixel_x 999.674053\n"
+              "# metersperpixel_y 999.62859\n"
+              "%d %d\n"
+              "%d\n" % (data.shape[1], data.shape[0], maxval))
+    content = header.encode() + data.tobytes()
+    if gzipped:
+        with gzip.open(filename, "wb") as f:
+            f.write(content)
+    else:
+        with open(filename, "wb") as f:
+            f.write(content)
+
+
+def test_io_import_fmi_pgm_16bit(tmp_path):
+    """Test that PGM files with more than 8 bits per pixel are rejected."""
+    filename = str(tmp_path / "test16.pgm")
+    _write_fmi_pgm(filename, np.zeros((4, 5), dtype=">u2"), maxval=65535)
+    with pytest.raises(ValueError):
+        pysteps.io.import_fmi_pgm(filename)
+
+
+def test_io_import_fmi_pgm_valid_mask(tmp_path):
+    """Test the valid_mask option of the importer FMI PGM."""
+    filename = str(tmp_path / "test.pgm")
+    data = np.random.RandomState(42).randint(0, 256, size=(20, 30))
+    data = data.astype(np.uint8)
+    data[0, :5] = 255
+    _write_fmi_pgm(filename, data)
+
+    R, _, metadata = pysteps.io.import_fmi_pgm(filename)
+    R_m, _, metadata_m = pysteps.io.import_fmi_pgm(filename, valid_mask=True)
+
+    assert np.array_equal(metadata_m["valid_mask"], data != 255)
+    assert np.array_equal(metadata_m["valid_mask"], np.isfinite(R))
+    assert np.all(np.isfinite(R_m))
+    assert np.array_equal(R_m[metadata_m["valid_mask"]],
+                          R[metadata_m["valid_mask"]])
+    assert metadata_m["zerovalue"] == metadata["zerovalue"]
+    assert metadata_m["threshold"] == metadata["threshold"]
+
+
+def test_io_import_fmi_pgm_valid_mask_no_data(tmp_path):
+    """Test the valid_mask option of the importer FMI PGM without valid
+    pixels."""
+    filename = str(tmp_path / "test.pgm")
+    _write_fmi_pgm(filename, np.full((20, 30), 255, dtype=np.uint8))
+
+    _, _, metadata = pysteps.io.import_fmi_pgm(filename, valid_mask=True)
+
+    assert not np.any(metadata["valid_mask"])
+    assert np.isnan(metadata["zerovalue"])
+    assert np.isnan(metadata["threshold"])
+
+
+@pytest.mark.parametrize("gzipped", [False, True])
+def test_io_import_fmi_pgm_truncated(tmp_path, gzipped):
+    """Test that the file is closed when the pixel data is truncated."""
+    filename = str(tmp_path / ("test.pgm.gz" if gzipped else "test.pgm"))
+    _write_fmi_pgm(filename, np.zeros((20, 30), dtype=np.uint8),
+                   gzipped=gzipped)
+    with open(filename, "rb") as f:
+        content = f.read()
+    with open(filename, "wb") as f:
+        f.write(content[:-100])
+
+    with warnings.catch_warnings(record=True) as w:
+        warnings.simplefilter("always")
+        with pytest.raises((ValueError, EOFError)):
+            pysteps.io.import_fmi_pgm(filename, gzipped=gzipped)
+        gc.collect()
+
+    assert not any(issubclass(w_.category, ResourceWarning) for w_ in w)
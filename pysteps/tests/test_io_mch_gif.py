@@ -2,6 +2,7 @@
 
 import os
 
+import numpy as np
 import pytest
 
 import pysteps
@@ -76,3 +77,81 @@ def test_io_import_mch_geodata(variable, expected, tolerance):
     """Test the importer MCH geodata."""
     geodata = pysteps.io.importers._import_mch_geodata()
     smart_assert(geodata[variable], expected, tolerance)
+
+
+def test_io_import_mch_aqc_lut():
+    """Test the lookup table of the MCH AQC and CPC products."""
+    lut = pysteps.io.importers._mch_aqc_lut
+    assert lut.shape == (256,)
+    for i in range(256):
+        if (i < 2) or (250 < i < 255):
+            assert lut[i] == 0.0
+        elif i == 255:
+            assert np.isnan(lut[i])
+        else:
+            expected = (10.0 ** ((i - 71.5) / 20.0) / 316.0) ** (1.0 / 1.5)
+            assert lut[i] == pytest.approx(expected, 1e-6)
+
+
+@pytest.mark.parametrize("num_workers", [1, 4])
+def test_io_importers_apply_lut_numba(monkeypatch, num_workers):
+    """Test the numba lookup table kernel against numpy indexing."""
+    pytest.importorskip("numba")
+    from concurrent.futures import ThreadPoolExecutor
+
+    monkeypatch.setattr(pysteps.io.importers, "_numba_min_size", 0)
+
+    B = np.random.RandomState(42).randint(0, 256, size=(64, 71)).astype(np.uint8)
+    lut = pysteps.io.importers._mch_aqc_lut
+
+    with ThreadPoolExecutor(max_workers=num_workers) as executor:
+        results = list(executor.map(
+            lambda _: pysteps.io.importers._apply_lut(B, lut), range(8)))
+
+    for R in results:
+        assert R.dtype == np.float32
+        assert np.array_equal(R, lut[B], equal_nan=True)
+
+
+def _write_mch_gif(filename, data):
+    """Write the 8-bit digital numbers in data to a palettized gif file."""
+    Image = pytest.importorskip("PIL.Image")
+    img = Image.fromarray(data, mode="P")
+    img.putpalette([v for i in range(256) for v in (i, i, i)])
+    # keep the digital numbers as they are instead of remapping the palette
+    img.save(filename, optimize=False)
+
+
+def test_io_import_mch_gif_valid_mask(tmp_path):
+    """Test the valid_mask option of the importer MCH GIF."""
+    filename = str(tmp_path / "AQC.gif")
+    data = np.random.RandomState(42).randint(0, 256, size=(20, 30))
+    data = data.astype(np.uint8)
+    data[0, :5] = 255
+    _write_mch_gif(filename, data)
+
+    R, _, metadata = pysteps.io.import_mch_gif(filename, "AQC", "mm", 5.0)
+    R_m, _, metadata_m = pysteps.io.import_mch_gif(filename, "AQC", "mm", 5.0,
+                                                   valid_mask=True)
+
+    assert np.array_equal(metadata_m["valid_mask"], data != 255)
+    assert np.array_equal(metadata_m["valid_mask"], np.isfinite(R))
+    assert np.all(np.isfinite(R_m))
+    assert np.array_equal(R_m[metadata_m["valid_mask"]],
+                          R[metadata_m["valid_mask"]])
+    assert metadata_m["zerovalue"] == metadata["zerovalue"]
+    assert metadata_m["threshold"] == metadata["threshold"]
+
+
+def test_io_import_mch_gif_valid_mask_no_data(tmp_path):
+    """Test the valid_mask option of the importer MCH GIF without valid
+    pixels."""
+    filename = str(tmp_path / "AQC.gif")
+    _write_mch_gif(filename, np.full((20, 30), 255, dtype=np.uint8))
+
+    _, _, metadata = pysteps.io.import_mch_gif(filename, "AQC", "mm", 5.0,
+                                               valid_mask=True)
+
+    assert not np.any(metadata["valid_mask"])
+    assert np.isnan(metadata["zerovalue"])
+    assert np.isnan(metadata["threshold"])
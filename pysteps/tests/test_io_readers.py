@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+
+# Test the io.readers module
+import numpy as np
+import pytest
+
+from pysteps.io.readers import read_files, read_timeseries
+
+
+def _dummy_importer(filename, **kwargs):
+    """Return a float64 field filled with the index encoded in filename.
+    With valid_mask=True, the first i pixels of file i are marked invalid."""
+    value = float(filename.split("_")[-1])
+    R = np.full((3, 4), value + kwargs.get("offset", 0.0))
+    Q = "Q_%s" % filename
+    metadata = {"filename": filename}
+    if kwargs.get("valid_mask", False):
+        MASK = np.ones(R.shape, dtype=bool)
+        MASK.flat[:int(value)] = False
+        R[~MASK] = -1.0
+        metadata["valid_mask"] = MASK
+    return R, Q, metadata
+
+
+@pytest.mark.parametrize("num_workers", [1, 4])
+def test_read_files(num_workers):
+    """Test reading a list of files with read_files."""
+    filenames = ["file_%d" % i for i in range(10)]
+
+    R, Q, metadata = read_files(filenames, _dummy_importer,
+                                num_workers=num_workers, offset=0.5)
+
+    assert R.shape == (10, 3, 4)
+    assert R.dtype == np.float32
+    for i in range(10):
+        assert np.all(R[i] == i + 0.5)
+    assert Q == ["Q_file_%d" % i for i in range(10)]
+    assert metadata["filename"] == "file_0"
+    assert "valid_mask" not in metadata
+
+
+@pytest.mark.parametrize("num_workers", [1, 4])
+def test_read_files_valid_mask(num_workers):
+    """Test that read_files stacks the valid pixel masks of all files."""
+    filenames = ["file_%d" % i for i in range(10)]
+
+    R, _, metadata = read_files(filenames, _dummy_importer,
+                                num_workers=num_workers, valid_mask=True)
+
+    MASK = metadata["valid_mask"]
+    assert MASK.shape == R.shape
+    assert MASK.dtype == bool
+    for i in range(10):
+        assert np.count_nonzero(~MASK[i]) == i
+        assert np.all(R[i][MASK[i]] == i)
+        assert np.all(R[i][~MASK[i]] == -1.0)
+
+
+def test_read_files_empty():
+    """Test read_files with an empty list of files."""
+    assert read_files([], _dummy_importer) == (None, None, None)
+
+
+def test_read_timeseries_valid_mask():
+    """Test that read_timeseries stacks the valid pixel masks of all files
+    and marks the missing files as invalid."""
+    def importer(filename, **kwargs):
+        R, _, metadata = _dummy_importer(filename, **kwargs)
+        return R, None, metadata
+
+    filenames = ["file_1", None, "file_3"]
+    inputfns = (filenames, ["t0", "t1", "t2"])
+
+    R, _, metadata = read_timeseries(inputfns, importer, valid_mask=True)
+
+    MASK = metadata["valid_mask"]
+    assert MASK.shape == R.shape == (3, 3, 4)
+    assert np.count_nonzero(~MASK[0]) == 1
+    assert not np.any(MASK[1])
+    assert np.all(np.isnan(R[1]))
+    assert np.count_nonzero(~MASK[2]) == 3
+    assert np.array_equal(metadata["timestamps"], ["t0", "t1", "t2"])
@@ -17,10 +17,55 @@ from . import dimension
 from . import fft
 from . import spectral
 
+
+def _do_nothing(R, metadata=None, *args, copy=True, **kwargs):
+    if metadata is None:
+        metadata = {}
+    if copy:
+        return R.copy(), metadata.copy()
+    else:
+        return R, metadata
+
+
+_utils_methods = dict()
+_utils_methods[None] = _do_nothing
+_utils_methods["none"] = _do_nothing
+# arrays methods
+_utils_methods["centred_coord"] = arrays.compute_centred_coord_array
+# conversion methods
+_utils_methods["mm/h"] = conversion.to_rainrate
+_utils_methods["rainrate"] = conversion.to_rainrate
+_utils_methods["mm"] = conversion.to_raindepth
+_utils_methods["raindepth"] = conversion.to_raindepth
+_utils_methods["dbz"] = conversion.to_reflectivity
+_utils_methods["reflectivity"] = conversion.to_reflectivity
+# transformation methods
+_utils_methods["boxcox"] = transformation.boxcox_transform
+_utils_methods["box-cox"] = transformation.boxcox_transform
+_utils_methods["db"] = transformation.dB_transform
+_utils_methods["decibel"] = transformation.dB_transform
+_utils_methods["log"] = transformation.boxcox_transform
+_utils_methods["nqt"] = transformation.NQ_transform
+_utils_methods["sqrt"] = transformation.sqrt_transform
+# dimension methods
+_utils_methods["accumulate"] = dimension.aggregate_fields_time
+_utils_methods["clip"] = dimension.clip_domain
+_utils_methods["square"] = dimension.square_domain
+_utils_methods["upscale"] = dimension.aggregate_fields_space
+# spectral methods
+_utils_methods["rapsd"] = spectral.rapsd
+_utils_methods["rm_rdisc"] = spectral.remove_rain_norain_discontinuity
+
+
 def get_method(name, **kwargs):
     """Return a callable function for the utility method corresponding to the
     given name.\n\
 
+    If name is None or "none", the returned method leaves its input unchanged
+    and returns a copy of the field and the metadata. Pass copy=False to that
+    method to return the inputs themselves when the caller does not modify
+    them.
+
     Arrays methods:
 
     +-------------------+--------------------------------------------------------+
@@ -99,38 +144,12 @@ def get_method(name, **kwargs):
 
     """
 
-    if name is None:
-        name = "none"
+    # names given in lower case are found without building a new string
+    if name in _utils_methods:
+        return _utils_methods[name]
 
     name = name.lower()
 
-    def donothing(R, metadata=None, *args, **kwargs):
-        return R.copy(), {} if metadata is None else metadata.copy()
-
-    methods_objects                  = dict()
-    methods_objects["none"]          = donothing
-    # arrays methods
-    methods_objects["centred_coord"] = arrays.compute_centred_coord_array
-    # conversion methods
-    methods_objects["mm/h"]          = conversion.to_rainrate
-    methods_objects["rainrate"]      = conversion.to_rainrate
-    methods_objects["mm"]            = conversion.to_raindepth
-    methods_objects["raindepth"]     = conversion.to_raindepth
-    methods_objects["dbz"]           = conversion.to_reflectivity
-    methods_objects["reflectivity"]  = conversion.to_reflectivity
-    # transformation methods
-    methods_objects["boxcox"]        = transformation.boxcox_transform
-    methods_objects["box-cox"]       = transformation.boxcox_transform
-    methods_objects["db"]            = transformation.dB_transform
-    methods_objects["decibel"]       = transformation.dB_transform
-    methods_objects["log"]           = transformation.boxcox_transform
-    methods_objects["nqt"]           = transformation.NQ_transform
-    methods_objects["sqrt"]          = transformation.sqrt_transform
-    # dimension methods
-    methods_objects["accumulate"]    = dimension.aggregate_fields_time
-    methods_objects["clip"]          = dimension.clip_domain
-    methods_objects["square"]        = dimension.square_domain
-    methods_objects["upscale"]       = dimension.aggregate_fields_space
     # FFT methods
     if name in ["numpy", "pyfftw", "scipy"]:
         if "shape" not in kwargs.keys():
@@ -138,13 +157,11 @@ def get_method(name, **kwargs):
         return _get_fft_method(name, **kwargs)
     else:
         try:
-            return methods_objects[name]
+            return _utils_methods[name]
         except KeyError as e:
             raise ValueError("Unknown method %s\n" % e +
-                             "Supported methods:%s" % str(methods_objects.keys()))
-    # spectral methods
-    methods_objects["rapsd"]        = spectral.rapsd
-    methods_objects["rm_rdisc"]     = spectral.remove_rain_norain_discontinuity
+                             "Supported methods:%s" % str(_utils_methods.keys()))
+
 
 def _get_fft_method(name, **kwargs):
     kwargs = kwargs.copy()